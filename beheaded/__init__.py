@@ -6,4 +6,40 @@
 # FILE: __init__.py
 # AUTHOR: Randall Nagy
 #
+from typing import TYPE_CHECKING
+from . import _lazy
 
+if TYPE_CHECKING:
+    from .core import (
+        read_file_header,
+        write_header_to_file,
+        add_default_header_to_file,
+        read_bejson_for_folder,
+        get_wrap_width_from_defaults,
+        file_mtime_string,
+        bump_version_in_file,
+        bump_version_in_tree,
+        apply_defaults_recursively,
+        cli_main,
+    )
+    from .tag_manager import TagManager
+
+_CORE_NAMES = (
+    "read_file_header",
+    "write_header_to_file",
+    "add_default_header_to_file",
+    "read_bejson_for_folder",
+    "get_wrap_width_from_defaults",
+    "file_mtime_string",
+    "bump_version_in_file",
+    "bump_version_in_tree",
+    "apply_defaults_recursively",
+    "cli_main",
+)
+_TAG_NAMES = (
+    "TagManager",
+)
+__all__ = _CORE_NAMES + _TAG_NAMES
+
+_lazy.install(globals(), ".core", _CORE_NAMES)
+_lazy.install(globals(), ".tag_manager", _TAG_NAMES)
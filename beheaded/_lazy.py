@@ -0,0 +1,38 @@
+# MISSION: Lazy package re-exports.
+# STATUS: Testing
+# VERSION: 0.0.1
+# NOTES: PEP 562 __getattr__ / __dir__ helper for package inits.
+# DATE: 2026-10-14 09:00:00
+# FILE: _lazy.py
+# AUTHOR: Randall Nagy
+#
+import sys
+
+
+def install(pkg_globals: dict, submod: str, names) -> None:
+    '''
+    Re-export `names` from `submod` (relative, e.g. ".core") on first use.
+    May be called once per submodule; the first call installs the
+    package's __getattr__ and __dir__.
+    '''
+    table = pkg_globals.setdefault("_LAZY", {})
+    target = pkg_globals["__name__"] + submod if submod.startswith(".") else submod
+    for name in names:
+        table[name] = (target, tuple(names))
+    if "__getattr__" in pkg_globals:
+        return
+
+    def __getattr__(name):
+        entry = table.get(name)
+        if entry is None:
+            raise AttributeError(f"module {pkg_globals['__name__']!r} has no attribute {name!r}")
+        target, group = entry
+        module = sys.modules.get(target) or __import__(target, fromlist=["*"])
+        pkg_globals.update({n: getattr(module, n) for n in group})
+        return pkg_globals[name]
+
+    def __dir__():
+        return sorted(pkg_globals.get("__all__", table))
+
+    pkg_globals["__getattr__"] = __getattr__
+    pkg_globals["__dir__"] = __dir__
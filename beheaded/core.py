@@ -29,18 +29,32 @@ Public functions expected by tests and package users:
 - mainloop
 """
 from __future__ import annotations
-import argparse
+import io
 import os
+import errno
+import math
+import time
 import re
 import sys
 import json
 import textwrap
 import tempfile
+import functools
+import threading
 import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Tuple, Optional
+from typing import TYPE_CHECKING, List, Dict, Tuple, Optional, Iterator
+
+if TYPE_CHECKING:
+    import argparse
 
 DEFAULT_ORDER = ["MISSION", "STATUS", "VERSION", "NOTES", "DATE", "FILE", "AUTHOR"]
+DEFAULT_ORDER_SET = frozenset(DEFAULT_ORDER)
+# Parsed keys are swapped for these canonical objects, so later dict lookups by
+# the DEFAULT_ORDER names hit on identity rather than comparing characters.
+_KEY_INTERN = {k: k for k in DEFAULT_ORDER}
 STATUS_ALLOWED = ["Production",
                   "Testing",
                   "Research",
@@ -50,26 +64,37 @@ STATUS_ALLOWED = ["Production",
                   "Unknown"]
 DEFAULT_WRAP = 72
 BEJSON_NAME = ".BeHeaders.json"
+TREE_WORKERS = min(32, (os.cpu_count() or 1) * 4)
 VERSION_RE = re.compile(r"^(\d+)\.(\d+)\.(\d+)$")
 KEY_RE = re.compile(r"^([A-Z]+):\s?(.*)$")
+_HEADER_CACHE_MAX = 256  # parsed files kept by read_file_header
 
-def find_python_files(start: str, recurse: bool = False) -> List[str]:
-    py_files: List[str] = []
+def iter_python_files(start: str, recurse: bool = False) -> Iterator[str]:
+    """
+    Yield python files under `start` as the walk finds them, one directory at a
+    time (names sorted within each directory), so bulk operations can start work
+    before the whole tree has been listed.
+    """
     if os.path.isfile(start) and start.endswith(".py"):
-        py_files.append(os.path.abspath(start))
-        return py_files
+        yield os.path.abspath(start)
+        return
     if os.path.isdir(start):
         if recurse:
-            for root, _, files in os.walk(start):
-                for f in files:
+            for root, dirs, files in os.walk(start):
+                dirs.sort()
+                for f in sorted(files):
                     if f.endswith(".py"):
-                        py_files.append(os.path.join(root, f))
+                        yield os.path.join(root, f)
         else:
-            for f in os.listdir(start):
-                p = os.path.join(start, f)
-                if f.endswith(".py") and os.path.isfile(p):
-                    py_files.append(p)
-    return sorted(py_files)
+            # scandir's DirEntry already knows the entry type, so no extra stat per file.
+            with os.scandir(start) as it:
+                for entry in it:
+                    if entry.name.endswith(".py") and entry.is_file():
+                        yield entry.path
+
+
+def find_python_files(start: str, recurse: bool = False) -> List[str]:
+    return sorted(iter_python_files(start, recurse))
 
 
 def read_bejson_for_folder(folder: str) -> Dict[str, object]:
@@ -102,70 +127,102 @@ def read_bejson_for_folder(folder: str) -> Dict[str, object]:
         return {}
 
 
+def _cached_bejson(folder: str, cache: Dict[str, Dict[str, object]]) -> Dict[str, object]:
+    """
+    read_bejson_for_folder() memoized in `cache` for the span of one bulk operation,
+    so a tree walk reads each folder's .BeHeaders.json once rather than once per file.
+    """
+    try:
+        return cache[folder]
+    except KeyError:
+        data = cache[folder] = read_bejson_for_folder(folder)
+        return data
+
+
 def file_mtime_string(path: str) -> str:
     try:
-        mtime = os.path.getmtime(path)
-        dt = datetime.fromtimestamp(mtime)
-        return dt.strftime("%Y-%m-%d %H:%M:%S")
+        return _seconds_string(os.path.getmtime(path))
     except Exception:
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return _now_string()
+
+
+def _now_string() -> str:
+    """ The current local time as "YYYY-MM-DD HH:MM:SS". """
+    return _seconds_string(time.time())
+
+
+def _seconds_string(ts: float) -> str:
+    """
+    Format a timestamp as datetime.fromtimestamp(ts).isoformat(" ", "seconds") does.
+    Files in a tree (and batches run in the same second) share a few distinct
+    seconds, so the formatting is done once per whole second.
+    """
+    secs = math.floor(ts)
+    if round((ts - secs) * 1e6) >= 1000000:  # fromtimestamp() rounds to the microsecond
+        secs += 1
+    return _format_whole_seconds(secs)
+
+
+@functools.lru_cache(maxsize=1024)
+def _format_whole_seconds(secs: int) -> str:
+    return datetime.fromtimestamp(secs).isoformat(" ")
+
+
+_PLACEHOLDERS = {"VERSION": "0.0.0"}  # every other DEFAULT_ORDER key falls back to "tbd."
+
+
+def _default_value(key: str, folder_defaults: Dict[str, object], basename: str, path: Optional[str]) -> str:
+    """
+    Value for a DEFAULT_ORDER `key` missing from a header: the file name for FILE,
+    else a non-empty folder default, else the file's mtime for DATE, else a placeholder.
+    """
+    if key == "FILE":
+        return basename
+    val = folder_defaults.get(key)
+    if val is not None and val != "":
+        return str(val)
+    if key == "DATE":
+        return file_mtime_string(path) if path else _now_string()
+    return _PLACEHOLDERS.get(key, "tbd.")
 
 
 class Header:
     def __init__(self):
-        self.key_order: List[str] = []
-        self.values: Dict[str, str] = {}
+        self.values: Dict[str, str] = {}  # insertion order is the key order
         self.raw_comment_lines: List[str] = []
 
+    # Keys are nearly always upper-case already (parser, DEFAULT_ORDER), so skip .upper() for them.
     def set(self, key: str, value: str):
-        k = key.upper()
-        if k not in self.key_order:
-            self.key_order.append(k)
-        self.values[k] = value
+        self.values[key if key.isupper() else key.upper()] = value
 
     def get(self, key: str) -> Optional[str]:
-        return self.values.get(key.upper())
+        return self.values.get(key if key.isupper() else key.upper())
 
     def has(self, key: str) -> bool:
-        return key.upper() in self.values
+        return (key if key.isupper() else key.upper()) in self.values
 
     def to_ordered_list(
-        self, folder_defaults: Dict[str, object], file_path: Optional[str] = None
+        self, folder_defaults: Dict[str, object], file_path: Optional[str] = None,
+        basename: Optional[str] = None
     ) -> List[Tuple[str, str]]:
         output: List[Tuple[str, str]] = []
-        seen = set()
-
-        def default_for(k: str) -> str:
-            ku = k.upper()
-            if ku == "FILE":
-                return os.path.basename(file_path) if file_path else "tbd."
-            if ku in folder_defaults and folder_defaults[ku] not in (None, ""):
-                return str(folder_defaults[ku])
-            if ku == "VERSION":
-                return "0.0.0"
-            if ku == "DATE":
-                return file_mtime_string(file_path) if file_path else datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            return "tbd."
+        if basename is None and file_path:
+            basename = os.path.basename(file_path)
+        file_value = basename if basename is not None else "tbd."
 
         for k in DEFAULT_ORDER:
             val = self.values.get(k)
             if val is None:
-                val = default_for(k)
+                val = _default_value(k, folder_defaults, file_value, file_path)
             else:
                 if k == "FILE":
-                    val = os.path.basename(file_path) if file_path else default_for(k)
+                    val = file_value
             output.append((k, val))
-            seen.add(k)
-
-        for k in self.key_order:
-            if k not in seen:
-                output.append((k, self.values.get(k, default_for(k))))
-                seen.add(k)
 
-        for k in list(self.values.keys()):
-            if k not in seen:
-                output.append((k, self.values[k]))
-                seen.add(k)
+        # then any other keys, in the order they were first set
+        for k, v in self.values.items():
+            if k not in DEFAULT_ORDER_SET:
+                output.append((k, v))
 
         return output
 
@@ -175,6 +232,7 @@ def parse_header_from_lines(lines: List[str]) -> Tuple[Optional[str], Header, Li
     Parse top-of-file header from given lines. Return (shebang_line_or_None, header_obj, rest_of_file_lines).
     Header block is contiguous comment lines starting at top after an optional shebang.
     This parser preserves blank comment lines and treats them as continuation lines (empty strings).
+    Lines are expected without trailing newlines (see _read_lines).
     """
     idx = 0
     shebang: Optional[str] = None
@@ -183,53 +241,211 @@ def parse_header_from_lines(lines: List[str]) -> Tuple[Optional[str], Header, Li
         return None, Header(), []
 
     if lines[0].startswith("#!"):
-        shebang = lines[0].rstrip("\n")
+        shebang = lines[0]
         idx = 1
 
-    comment_block: List[str] = []
-    while idx < n and lines[idx].lstrip().startswith("#"):
-        comment_block.append(lines[idx].rstrip("\n"))
-        idx += 1
+    # Files without a header block are common in tree walks: skip the parser setup.
+    if idx >= n or (lines[idx][:1] != "#" and not lines[idx].lstrip().startswith("#")):
+        return shebang, Header(), lines[idx:]
 
-    rest = [l.rstrip("\n") for l in lines[idx:]]
     header = Header()
-    header.raw_comment_lines = list(comment_block)
+    raw_append = header.raw_comment_lines.append
     current_key: Optional[str] = None
     current_lines: List[str] = []
-
-    for c in comment_block:
-        if c.startswith("#"):
-            content = c[1:]
-            if content.startswith(" "):
-                content = content[1:]
-            content = content.rstrip("\n")
-        else:
-            content = c
-        m = KEY_RE.match(content)
-        if m:
+    preamble: List[str] = []
+    append = preamble.append
+    set_value = header.set
+
+    # One pass: collect the comment block and classify each line as it is seen.
+    while idx < n:
+        c = lines[idx]
+        # Most comment lines start in column 0; only lstrip() the rest.
+        if c[:1] != "#" and not c.lstrip().startswith("#"):
+            break
+        raw_append(c)
+        idx += 1
+        # A key line is r"^# ?([A-Z]+):\s?(.*)$", matched with str ops: only lines
+        # whose lead letter could start a key are split on the first ":".
+        # Everything else is continuation text.
+        lead = c[1:2] if c[:1] == "#" else ""
+        skip = 1
+        if lead == " ":
+            lead = c[2:3]
+            skip = 2
+        key = ""
+        if "A" <= lead <= "Z":
+            key, sep, first_val = c[skip:].partition(":")
+            if not (sep and key.isalpha() and key.isascii() and key.isupper()):
+                key = ""
+            else:
+                key = _KEY_INTERN.get(key, key)
+        if key:
             if current_key:
-                header.set(current_key, "\n".join(current_lines).rstrip())
-            current_key = m.group(1).upper()
-            first_val = m.group(2) or ""
+                set_value(current_key, "\n".join(current_lines).rstrip())
+            elif preamble:
+                set_value("PREAMBLE", "\n".join(preamble))
+            current_key = key
+            if first_val[:1].isspace():  # the regex's optional \s
+                first_val = first_val[1:]
             current_lines = [first_val.rstrip()]
+            append = current_lines.append
         else:
-            if current_key:
-                current_lines.append(content.rstrip())
+            if c[:2] == "# ":
+                append(c[2:].rstrip())
+            elif c[:1] == "#":
+                append(c[1:].rstrip())
             else:
-                if not header.has("PREAMBLE"):
-                    header.set("PREAMBLE", content.rstrip())
-                else:
-                    header.set("PREAMBLE", header.get("PREAMBLE") + "\n" + content.rstrip())
+                append(c.rstrip())
     if current_key:
-        header.set(current_key, "\n".join(current_lines).rstrip())
+        set_value(current_key, "\n".join(current_lines).rstrip())
+    elif preamble:
+        set_value("PREAMBLE", "\n".join(preamble))
+
+    return shebang, header, lines[idx:]
+
+
+def _read_lines(path: str) -> List[str]:
+    """
+    Read a file as a list of lines without their newlines, in one read() call.
+    The file is read unbuffered as bytes and decoded in one go, which skips the
+    buffered text-layer setup; \r\n and \r are folded to \n exactly as text mode
+    would. Splits on "\n" only, so other characters str.splitlines() treats as
+    breaks stay inside their line.
+    """
+    with open(path, "rb", buffering=0) as fh:
+        text = fh.read().decode("utf-8")
+    if "\r" in text:
+        text = io.IncrementalNewlineDecoder(None, translate=True).decode(text, final=True)
+    if not text:
+        return []
+    lines = text.split("\n")
+    if text.endswith("\n"):
+        lines.pop()
+    return lines
+
+
+def _write_lines(path: str, lines: List[str]) -> None:
+    """
+    Write newline-free lines back as one "\n"-terminated text in a single write().
+    An existing file is replaced atomically: the text goes to a temporary file in
+    the same folder (given the original's permissions), then os.replace() swaps it
+    in, so an interrupted write never leaves a truncated source file behind.
+    Files the user may not write are refused, as an in-place write would be. Where
+    a swap would lose something (hard links, an owner or group the user cannot
+    set, a folder the user cannot write to) the file is rewritten in place.
+    """
+    with _header_cache_lock:
+        _header_cache.pop(os.path.abspath(path), None)
+    text = "\n".join(lines) + "\n" if lines else ""
+    target = os.path.realpath(path)  # through a symlink, replace the file itself
+    try:
+        st = os.stat(target)
+    except FileNotFoundError:
+        _write_in_place(path, text)
+        return
+    if not os.access(target, os.W_OK):
+        raise PermissionError(errno.EACCES, os.strerror(errno.EACCES), path)
+    if st.st_nlink > 1 or not _replace_file(target, text, st):
+        _write_in_place(target, text)
+
+
+def _write_in_place(path: str, text: str) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(text)
 
-    return shebang, header, rest
+
+def _replace_file(target: str, text: str, st: os.stat_result) -> bool:
+    """
+    Swap `text` in for `target` through a temporary file carrying the original's
+    owner, group and mode. False, with nothing changed, when that is not allowed.
+    """
+    folder, name = os.path.split(target)
+    try:
+        fd, tmp = tempfile.mkstemp(prefix="." + name + ".", suffix=".tmp", dir=folder)
+    except PermissionError:
+        return False
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(text)
+            tst = os.fstat(fh.fileno())
+        if hasattr(os, "chown") and (tst.st_uid, tst.st_gid) != (st.st_uid, st.st_gid):
+            try:
+                os.chown(tmp, st.st_uid, st.st_gid)
+            except PermissionError:
+                os.unlink(tmp)
+                return False
+        os.chmod(tmp, st.st_mode & 0o7777)  # after chown, which may clear set-id bits
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return True
 
 
-def read_file_header(path: str) -> Tuple[Optional[str], Header, List[str]]:
+# abspath -> (mtime_ns, size, inode, shebang, values, raw_comment_lines, rest)
+_header_cache: Dict[str, tuple] = {}
+_header_cache_lock = threading.Lock()
+
+
+def _read_head_lines(path: str, body_lines: int) -> List[str]:
+    """
+    Like _read_lines(), but stop reading once the header block and `body_lines`
+    lines after it have been seen, so a long file is not read to the end.
+    """
+    lines: List[str] = []
+    append = lines.append
+    in_header = True
     with open(path, "r", encoding="utf-8") as fh:
-        lines = fh.readlines()
-    return parse_header_from_lines(lines)
+        for line in fh:
+            if line.endswith("\n"):
+                line = line[:-1]
+            if in_header and line[:1] != "#" and not line.lstrip().startswith("#"):
+                in_header = False
+            if not in_header:
+                if body_lines <= 0:
+                    break
+                body_lines -= 1
+            append(line)
+    return lines
+
+
+def read_file_header(path: str, body_lines: Optional[int] = None,
+                     cache: bool = True) -> Tuple[Optional[str], Header, List[str]]:
+    """
+    Parse the header of `path`. Results are remembered per file and reused while
+    its mtime, size and inode are unchanged; callers always get their own copies.
+    Pass `body_lines` when only that many lines after the header are needed: the
+    returned body is cut to that length and, on a cache miss, only the start of
+    the file is read (such partial parses are not cached). Pass cache=False when
+    the file is about to be rewritten: it is parsed afresh and nothing is kept.
+    """
+    if not cache:
+        lines = _read_head_lines(path, body_lines) if body_lines is not None else _read_lines(path)
+        return parse_header_from_lines(lines)
+    key = os.path.abspath(path)
+    try:
+        st = os.stat(key)
+    except OSError:
+        return parse_header_from_lines(_read_lines(path))  # raises as before
+    stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+    hit = _header_cache.get(key)
+    if hit is None or hit[:3] != stamp:
+        if body_lines is not None:
+            return parse_header_from_lines(_read_head_lines(path, body_lines))
+        shebang, header, rest = parse_header_from_lines(_read_lines(path))
+        hit = stamp + (shebang, dict(header.values), list(header.raw_comment_lines), list(rest))
+        with _header_cache_lock:
+            if len(_header_cache) >= _HEADER_CACHE_MAX:
+                _header_cache.pop(next(iter(_header_cache)), None)
+            _header_cache[key] = hit
+        return shebang, header, rest
+    header = Header()
+    header.values = dict(hit[4])
+    header.raw_comment_lines = list(hit[5])
+    return hit[3], header, list(hit[6][:body_lines] if body_lines is not None else hit[6])
 
 
 def get_wrap_width_from_defaults(folder_defaults: Dict[str, object]) -> int:
@@ -244,71 +460,74 @@ def get_wrap_width_from_defaults(folder_defaults: Dict[str, object]) -> int:
     return DEFAULT_WRAP
 
 
-def write_header_to_file(path: str, shebang: Optional[str], header: Header, folder_defaults: Dict[str, object]) -> None:
-    # read rest of file to preserve content after header
-    with open(path, "r", encoding="utf-8") as fh:
-        orig_lines = fh.readlines()
+@functools.lru_cache(maxsize=None)
+def _get_wrapper(width: int) -> textwrap.TextWrapper:
+    """ One TextWrapper per wrap width, same options as textwrap.wrap(). """
+    return textwrap.TextWrapper(width=width)
+
+
+def _format_field(key: str, val: str, wrap_width: int) -> Iterator[str]:
+    """ Yield the comment lines for one header field. """
+    if key == "PREAMBLE":
+        for pl in val.splitlines():
+            yield "# " + pl if pl else "#"
+    elif key == "MISSION":
+        first, *restwrap = _get_wrapper(wrap_width).wrap(val) or [""]
+        yield "# MISSION: " + first
+        for wline in restwrap:
+            yield "# " + wline
+    else:
+        lines = val.splitlines()
+        if not lines:
+            yield "# " + key + ":"
+            return
+        first = lines[0]
+        yield "# " + key + ": " + first if first else "# " + key + ":"
+        for l in lines[1:]:
+            yield "# " + l if l else "#"
+
 
-    _, _, rest = parse_header_from_lines([l.rstrip("\n") for l in orig_lines])
+def write_header_to_file(path: str, shebang: Optional[str], header: Header, folder_defaults: Dict[str, object],
+                         rest: Optional[List[str]] = None) -> None:
+    """
+    Rewrite the header of `path`. Callers that have just parsed the file may pass the
+    body lines they got back as `rest`; otherwise the file is read again to find them.
+    """
+    if rest is None:
+        # read rest of file to preserve content after header
+        _, _, rest = parse_header_from_lines(_read_lines(path))
 
     # Ensure FILE matches filename
-    header.set("FILE", os.path.basename(path))
+    basename = os.path.basename(path)
+    header.set("FILE", basename)
 
-    ordered = header.to_ordered_list(folder_defaults, file_path=path)
+    ordered = header.to_ordered_list(folder_defaults, file_path=path, basename=basename)
     wrap_width = get_wrap_width_from_defaults(folder_defaults)
 
     out_lines: List[str] = []
     if shebang:
         out_lines.append(shebang.rstrip("\n"))
-
     for key, val in ordered:
-        if key == "PREAMBLE":
-            for pl in str(val).splitlines():
-                out_lines.append(f"# {pl}" if pl != "" else "#")
-            continue
-
-        if key == "MISSION":
-            wrapped = textwrap.wrap(str(val), wrap_width) or [""]
-            if wrapped:
-                first, *restwrap = wrapped
-                out_lines.append(f"# {key}: {first}")
-                for wline in restwrap:
-                    out_lines.append(f"# {wline}")
-            else:
-                out_lines.append(f"# {key}:")
-        else:
-            lines = str(val).splitlines()
-            if lines:
-                first, *restlines = lines
-                out_lines.append(f"# {key}: {first}" if first != "" else f"# {key}:")
-                for l in restlines:
-                    out_lines.append(f"# {l}" if l != "" else "#")
-            else:
-                out_lines.append(f"# {key}:")
-
+        out_lines.extend(_format_field(key, str(val), wrap_width))
     out_lines.append("#")
-    for r in rest:
-        out_lines.append(r)
-
-    with open(path, "w", encoding="utf-8") as fh:
-        for l in out_lines:
-            fh.write(l.rstrip("\n") + "\n")
+    out_lines.extend(rest)
+    _write_lines(path, out_lines)
 
 
 def show_header_on_stdout(path: str) -> None:
-    shebang, header, rest = read_file_header(path)
-    print(f"File: {path}")
+    shebang, header, rest = read_file_header(path, body_lines=10)
+    out = [f"File: {path}"]
     if shebang:
-        print(f"Shebang: {shebang}")
+        out.append(f"Shebang: {shebang}")
     folder_defaults = read_bejson_for_folder(os.path.dirname(path))
     for k, v in header.to_ordered_list(folder_defaults, file_path=path):
-        print(f"{k}:")
-        for line in str(v).splitlines():
-            print("  " + line)
-    print("---- file content (first 10 lines after header) ----")
-    for i, line in enumerate(rest[:10], 1):
-        print(f"{i:2d}: {line}")
-    print("--------------------------------------------------")
+        out.append(f"{k}:")
+        out.extend("  " + line for line in str(v).splitlines())
+    out.append("---- file content (first 10 lines after header) ----")
+    out.extend(f"{i:2d}: {line}" for i, line in enumerate(rest[:10], 1))
+    out.append("--------------------------------------------------")
+    # one write for the whole report
+    print("\n".join(out))
 
 
 def edit_multiline_with_editor(initial_text: str) -> str:
@@ -343,11 +562,12 @@ def edit_multiline_with_editor(initial_text: str) -> str:
 
 def interactive_edit_header(path: str) -> None:
     folder_defaults = read_bejson_for_folder(os.path.dirname(path))
-    shebang, header, _ = read_file_header(path)
-    ordered = header.to_ordered_list(folder_defaults, file_path=path)
+    shebang, header, _ = read_file_header(path, body_lines=0)
+    basename = os.path.basename(path)
+    ordered = header.to_ordered_list(folder_defaults, file_path=path, basename=basename)
     edit = {k: v for k, v in ordered}
     # ensure FILE reflects the actual filename
-    edit["FILE"] = os.path.basename(path)
+    edit["FILE"] = basename
     print(f"Editing header for {path}. Enter to keep current value. Commands: .q to quit without saving, .w to save and exit.")
     while True:
         print("\nCurrent header values (first line shown):")
@@ -395,23 +615,35 @@ def interactive_edit_header(path: str) -> None:
                     val = cur
             if key == "FILE":
                 print("FILE is automatically set to the filename and cannot be edited.")
-                val = os.path.basename(path)
+                val = basename
             edit[key] = val
         except ValueError:
             print("Unknown command.")
 
 
+def _parse_version(text: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Split a stripped "major.minor.patch" string into ints, or None when it is not
+    in that form. Same strings as VERSION_RE (isdecimal() is the regex's \\d),
+    without running the regex engine.
+    """
+    parts = text.split(".")
+    if len(parts) == 3 and parts[0].isdecimal() and parts[1].isdecimal() and parts[2].isdecimal():
+        return int(parts[0]), int(parts[1]), int(parts[2])
+    return None
+
+
 def bump_version_interactive(current_version: str) -> Optional[str]:
     cur = (current_version.strip() if current_version else "0.0.0") or "0.0.0"
-    m = VERSION_RE.match(cur)
-    if not m:
+    parsed = _parse_version(cur)
+    if parsed is None:
         print(f"Current version '{cur}' is not in dotted numeric form. Reset to 0.0.0? (y/N)")
         if input().strip().lower() == "y":
             major, minor, patch = 0, 0, 0
         else:
             return None
     else:
-        major, minor, patch = map(int, m.groups())
+        major, minor, patch = parsed
     print(f"Current version: {major}.{minor}.{patch}")
     part = input("Which part to bump? (major/minor/patch): ").strip().lower()
     if part not in ("major", "minor", "patch"):
@@ -429,15 +661,37 @@ def bump_version_interactive(current_version: str) -> Optional[str]:
     return f"{major}.{minor}.{patch}"
 
 
-def bump_version_in_file(path: str, part: str) -> bool:
-    folder_defaults = read_bejson_for_folder(os.path.dirname(path))
-    shebang, header, _ = read_file_header(path)
-    oldv = header.get("VERSION") or folder_defaults.get("VERSION") or "0.0.0"
-    m = VERSION_RE.match(str(oldv).strip())
-    if not m:
-        major, minor, patch = 0, 0, 0
+def _prepare_one(path: str, folder_defaults: Dict[str, object], mutate, dry_run: bool = False):
+    """
+    Read and parse `path` once and let `mutate(header)` edit the header in place.
+    `mutate` returns a falsy value when nothing changed. Returns (result, write),
+    where write() saves the header with the body from that same parse, or is None
+    when nothing needs writing. A dry run never writes, so it only reads the file
+    up to the end of the header; otherwise the header cache is bypassed, as the
+    write would only evict the entry again.
+    """
+    if dry_run:
+        shebang, header, rest = read_file_header(path, body_lines=0)
     else:
-        major, minor, patch = map(int, m.groups())
+        shebang, header, rest = read_file_header(path, cache=False)
+    result = mutate(header)
+    if not result or dry_run:
+        return result, None
+    return result, functools.partial(write_header_to_file, path, shebang, header, folder_defaults, rest)
+
+
+def _process_one(path: str, folder_defaults: Dict[str, object], mutate, dry_run: bool = False):
+    """ _prepare_one() and its write in one step; returns the result of `mutate`. """
+    result, write = _prepare_one(path, folder_defaults, mutate, dry_run)
+    if write is not None:
+        write()
+    return result
+
+
+def _bump_header(header: Header, part: str, folder_defaults: Dict[str, object]) -> Optional[Tuple[str, str]]:
+    """ Bump VERSION in `header`. Returns (old, new), or None for an unknown part. """
+    oldv = header.get("VERSION") or folder_defaults.get("VERSION") or "0.0.0"
+    major, minor, patch = _parse_version(str(oldv).strip()) or (0, 0, 0)
     if part == "major":
         major += 1
         minor = 0
@@ -448,103 +702,113 @@ def bump_version_in_file(path: str, part: str) -> bool:
     elif part == "patch":
         patch += 1
     else:
-        return False
+        return None
     newv = f"{major}.{minor}.{patch}"
     header.set("VERSION", newv)
-    write_header_to_file(path, shebang, header, folder_defaults)
-    return True
+    return str(oldv), newv
+
+
+def bump_version_in_file(path: str, part: str) -> bool:
+    folder_defaults = read_bejson_for_folder(os.path.dirname(path))
+    bumped = _process_one(path, folder_defaults, lambda h: _bump_header(h, part, folder_defaults))
+    return bumped is not None
+
+
+def _map_tree(start: str, work) -> List[object]:
+    """
+    Call work(path, folder_defaults) -> (result, write) for every python file under
+    `start`. The reads and parses run ahead on a thread pool; folder defaults are
+    resolved in the walking thread, so each .BeHeaders.json is read once. The writes
+    run in walk order in the calling thread, each after every earlier file has been
+    read and written: the first read or write that fails stops the walk with the
+    files after it untouched, as a one-file-at-a-time walk would do.
+    """
+    defaults_cache: Dict[str, Dict[str, object]] = {}
+    files = iter_python_files(start, recurse=True)
+    results: List[object] = []
+    pending = deque()  # reads in flight, bounded so bodies waiting to be written stay few
+    with ThreadPoolExecutor(max_workers=TREE_WORKERS) as pool:
+        def submit_next() -> None:
+            for f in files:
+                pending.append(pool.submit(work, f, _cached_bejson(os.path.dirname(f), defaults_cache)))
+                return
+
+        for _ in range(TREE_WORKERS * 2):
+            submit_next()
+        try:
+            while pending:
+                result, write = pending.popleft().result()
+                if write is not None:
+                    write()
+                results.append(result)
+                submit_next()
+        finally:
+            for fut in pending:
+                fut.cancel()
+    return results
 
 
 def bump_version_in_tree(start: str, part: str, dry_run: bool = False) -> List[str]:
-    files = find_python_files(start, recurse=True)
-    changed: List[str] = []
-    for f in files:
-        folder_defaults = read_bejson_for_folder(os.path.dirname(f))
-        shebang, header, _ = read_file_header(f)
-        oldv = header.get("VERSION") or folder_defaults.get("VERSION") or "0.0.0"
-        m = VERSION_RE.match(str(oldv).strip())
-        if not m:
-            major, minor, patch = 0, 0, 0
-        else:
-            major, minor, patch = map(int, m.groups())
-        if part == "major":
-            major += 1
-            minor = 0
-            patch = 0
-        elif part == "minor":
-            minor += 1
-            patch = 0
-        else:
-            patch += 1
-        newv = f"{major}.{minor}.{patch}"
-        if str(oldv).strip() != newv:
-            header.set("VERSION", newv)
-            if dry_run:
-                changed.append(f"{f}: {oldv} -> {newv}")
-            else:
-                write_header_to_file(f, shebang, header, folder_defaults)
-                changed.append(f"{f}: {oldv} -> {newv}")
-    return changed
+    # The tree walk has always treated anything but major/minor as a patch bump.
+    part = part if part in ("major", "minor") else "patch"
+
+    def work(f: str, folder_defaults: Dict[str, object]):
+        bumped, write = _prepare_one(f, folder_defaults, lambda h: _bump_header(h, part, folder_defaults), dry_run)
+        return (f"{f}: {bumped[0]} -> {bumped[1]}" if bumped else None), write
+
+    return [c for c in _map_tree(start, work) if c]
 
 
 def remove_header_from_file(path: str) -> None:
-    with open(path, "r", encoding="utf-8") as fh:
-        lines = fh.readlines()
-    shebang, _, rest = parse_header_from_lines([l.rstrip("\n") for l in lines])
-    out_lines: List[str] = []
-    if shebang:
-        out_lines.append(shebang)
-    for r in rest:
-        out_lines.append(r)
-    with open(path, "w", encoding="utf-8") as fh:
-        for l in out_lines:
-            fh.write(l.rstrip("\n") + "\n")
+    shebang, _, rest = parse_header_from_lines(_read_lines(path))
+    _write_lines(path, [shebang] + rest if shebang else rest)
 
 
 def add_default_header_to_file(path: str, folder_defaults: Optional[Dict[str, object]] = None, dry_run: bool = False) -> bool:
     if folder_defaults is None:
         folder_defaults = read_bejson_for_folder(os.path.dirname(path))
-    shebang, header, _ = read_file_header(path)
-    changed = False
-    for k in DEFAULT_ORDER:
-        if not header.has(k):
-            if k == "FILE":
-                header.set(k, os.path.basename(path))
-            elif k in folder_defaults and folder_defaults[k] not in (None, ""):
-                header.set(k, str(folder_defaults[k]))
-            else:
-                if k == "VERSION":
-                    header.set(k, "0.0.0")
-                elif k == "DATE":
-                    header.set(k, file_mtime_string(path))
-                else:
-                    header.set(k, "tbd.")
-            changed = True
-    header.set("FILE", os.path.basename(path))
-    if changed and not dry_run:
-        write_header_to_file(path, shebang, header, folder_defaults)
-    elif not changed:
-        current_file_val = header.get("FILE")
-        if current_file_val != os.path.basename(path):
-            if not dry_run:
-                write_header_to_file(path, shebang, header, folder_defaults)
+    return _process_one(path, folder_defaults, _defaults_filler(path, folder_defaults), dry_run)
+
+
+def _defaults_filler(path: str, folder_defaults: Dict[str, object]):
+    """ The header mutation behind add_default_header_to_file(): True when it changed something. """
+    basename = os.path.basename(path)
+
+    def fill_missing(header: Header) -> bool:
+        changed = False
+        for k in DEFAULT_ORDER:
+            if not header.has(k):
+                header.set(k, _default_value(k, folder_defaults, basename, path))
+                changed = True
+        if header.get("FILE") != basename:
+            header.set("FILE", basename)
             changed = True
-    return changed
+        return changed
+
+    return fill_missing
 
 
 def apply_defaults_recursively(start: str, dry_run: bool = False) -> List[str]:
-    files = find_python_files(start, recurse=True)
-    changed: List[str] = []
-    for f in files:
-        fd = read_bejson_for_folder(os.path.dirname(f))
-        did = add_default_header_to_file(f, folder_defaults=fd, dry_run=dry_run)
-        if did:
-            changed.append(f)
-    return changed
+    def work(f: str, fd: Dict[str, object]):
+        did, write = _prepare_one(f, fd, _defaults_filler(f, fd), dry_run)
+        return (f if did else None), write
+
+    return [f for f in _map_tree(start, work) if f]
+
+
+def _print_report(heading: Optional[str], items: List[str], summary: str) -> None:
+    """ Print an optional heading, one line per item and a summary line in one write. """
+    out = [heading] if heading else []
+    out.extend(items)
+    out.append(summary)
+    print("\n".join(out))
 
 
 # CLI functions
-def cli_main():
+@functools.lru_cache(maxsize=None)
+def _build_parser() -> "argparse.ArgumentParser":
+    """ Build the CLI parser once per process; argparse is only imported when flags are used. """
+    import argparse
     parser = argparse.ArgumentParser(description="BeHeaded - manage python file header comments.")
     parser.add_argument("paths", nargs="*", help="Files or folders to operate on. If a single filename is provided with no options, interactive mainloop will be used.")
     parser.add_argument("--list", "-l", action="store_true", help="List python files in current directory (or provided path).")
@@ -563,24 +827,23 @@ def cli_main():
 ##    parser.add_argument("--gdefine", "-r", metavar="FILE", help="Define new global header set.")
 ##    parser.add_argument("--gupdate", "-r", metavar="FILE", help="Update a global header set.")
 ##    parser.add_argument("--gdelete", "-r", metavar="FILE", help="Remove a global header set.")
-    args, _ = parser.parse_known_args()
+    return parser
+
 
-    provided_flags = any([args.list, args.show, args.edit, args.add, args.remove, args.recurse,
-                           args.bump, args.apply_all_defaults, args.select, getattr(args, "bump_all", None), args.dry_run])
-    if (len(sys.argv) == 1) or (len(sys.argv) == 2 and os.path.isfile(sys.argv[1]) and not provided_flags) or (args.select and not provided_flags):
-        start_file = None
-        if len(sys.argv) == 2 and os.path.isfile(sys.argv[1]):
-            start_file = os.path.abspath(sys.argv[1])
-        if args.select:
-            start_file = os.path.abspath(args.select)
-        mainloop(start_file)
+def cli_main():
+    # Interactive fast path: no arguments, or a single existing file, needs no parser.
+    if len(sys.argv) == 1 or (len(sys.argv) == 2 and os.path.isfile(sys.argv[1])):
+        mainloop(os.path.abspath(sys.argv[1]) if len(sys.argv) == 2 else None)
         return
 
+    parser = _build_parser()
+    args, _ = parser.parse_known_args()
+
     if args.list:
         target = args.paths[0] if args.paths else "."
         files = find_python_files(target, recurse=False)
-        for f in files:
-            print(f)
+        if files:
+            print("\n".join(files))
         return
 
     if args.show:
@@ -635,63 +898,28 @@ def cli_main():
             return
         start = start or "."
         changes = bump_version_in_tree(start, part, dry_run=args.dry_run)
-        if args.dry_run:
-            print("Dry-run. Changes that would be made:")
-        for c in changes:
-            print(c)
-        print(f"{len(changes)} file(s) affected.")
+        _print_report("Dry-run. Changes that would be made:" if args.dry_run else None,
+                      changes, f"{len(changes)} file(s) affected.")
         return
 
     if args.recurse:
         start = args.recurse or "."
         changes = apply_defaults_recursively(start, dry_run=args.dry_run)
-        if args.dry_run:
-            print("Dry-run. Files that would be changed:")
-        for c in changes:
-            print(c)
-        print(f"{len(changes)} file(s) {'would be changed' if args.dry_run else 'changed'}.")
+        _print_report("Dry-run. Files that would be changed:" if args.dry_run else None,
+                      changes, f"{len(changes)} file(s) {'would be changed' if args.dry_run else 'changed'}.")
         return
 
     if args.apply_all_defaults:
         start = args.paths[0] if args.paths else "."
         changes = apply_defaults_recursively(start, dry_run=args.dry_run)
-        if args.dry_run:
-            print("Dry-run. Files that would be changed:")
-        for c in changes:
-            print(c)
-        print(f"{len(changes)} file(s) {'would be changed' if args.dry_run else 'changed'}.")
+        _print_report("Dry-run. Files that would be changed:" if args.dry_run else None,
+                      changes, f"{len(changes)} file(s) {'would be changed' if args.dry_run else 'changed'}.")
         return
 
     parser.print_help()
 
 
-def mainloop(start_file: Optional[str] = None):
-    cwd = os.getcwd()
-    print(cwd)
-    files = find_python_files(cwd, recurse=False)
-    selected: Optional[str] = None
-    if start_file:
-        selected = start_file
-
-    print("BeHeaded interactive mainloop. Type 'help' for commands.")
-    while True:
-        prompt = f"[{os.path.basename(selected) if selected else 'no-file'}] > "
-        try:
-            cmdline = input(prompt).strip()
-        except (EOFError, KeyboardInterrupt):
-            print("\nExiting.")
-            return
-        if not cmdline:
-            continue
-        parts = cmdline.split()
-        cmd = parts[0].lower()
-        args = parts[1:]
-
-        if cmd in ("q", "quit", "exit"):
-            print("Exiting.")
-            return
-        if cmd in ("help", "h", "?"):
-            print("""Commands:
+_MAINLOOP_HELP = """Commands:
  list                 - list python files in current directory
  select <num|name>    - select file by number (from list) or by path/name
  show                 - show header of selected file
@@ -706,136 +934,157 @@ def mainloop(start_file: Optional[str] = None):
  ls                   - alias for list
  help                 - this help
  quit                 - exit
-""")
-            continue
+"""
 
-        if cmd in ("list", "ls"):
-            files = find_python_files(cwd, recurse=False)
-            if not files:
-                print("No python files found in current directory.")
-                continue
-            for i, f in enumerate(files, 1):
-                print(f"{i:3d}. {os.path.basename(f)}  ({f})")
-            continue
+# mainloop commands that act on the selected file
+_NEEDS_FILE = frozenset(("show", "edit", "add", "remove", "bump"))
 
-        if cmd == "refresh":
-            files = find_python_files(cwd, recurse=False)
-            print("Refreshed.")
-            continue
 
-        if cmd == "select":
-            if not args:
-                print("Provide number or filename.")
-                continue
-            token = args[0]
-            try:
-                idx = int(token)
-                if 1 <= idx <= len(files):
-                    selected = files[idx - 1]
-                    print(f"Selected {selected}")
-                else:
-                    print("Index out of range.")
-                continue
-            except ValueError:
-                cand = os.path.abspath(token)
-                if os.path.exists(cand) and cand.endswith(".py"):
-                    selected = cand
+def mainloop(start_file: Optional[str] = None):
+    cwd = os.getcwd()
+    print(cwd)
+    files = find_python_files(cwd, recurse=False)
+    selected: Optional[str] = None
+    if start_file:
+        selected = start_file
+
+    def do_help(args: List[str]) -> None:
+        print(_MAINLOOP_HELP)
+
+    def do_list(args: List[str]) -> None:
+        nonlocal files
+        files = find_python_files(cwd, recurse=False)
+        if not files:
+            print("No python files found in current directory.")
+            return
+        print("\n".join(f"{i:3d}. {os.path.basename(f)}  ({f})" for i, f in enumerate(files, 1)))
+
+    def do_refresh(args: List[str]) -> None:
+        nonlocal files
+        files = find_python_files(cwd, recurse=False)
+        print("Refreshed.")
+
+    def do_select(args: List[str]) -> None:
+        nonlocal selected
+        if not args:
+            print("Provide number or filename.")
+            return
+        token = args[0]
+        try:
+            idx = int(token)
+        except ValueError:
+            cand = os.path.abspath(token)
+            if os.path.exists(cand) and cand.endswith(".py"):
+                selected = cand
+                print(f"Selected {selected}")
+            else:
+                matches = [f for f in files if os.path.basename(f) == token]
+                if len(matches) == 1:
+                    selected = matches[0]
                     print(f"Selected {selected}")
+                elif len(matches) > 1:
+                    print("\n".join(["Multiple matches, specify path or choose index:"]
+                                    + [f"{i:2d}. {f}" for i, f in enumerate(matches, 1)]))
                 else:
-                    matches = [f for f in files if os.path.basename(f) == token]
-                    if len(matches) == 1:
-                        selected = matches[0]
-                        print(f"Selected {selected}")
-                    elif len(matches) > 1:
-                        print("Multiple matches, specify path or choose index:")
-                        for i, f in enumerate(matches, 1):
-                            print(f"{i:2d}. {f}")
-                    else:
-                        print("No match found.")
-                continue
-
-        if cmd == "show":
-            if not selected:
-                print("No file selected.")
-                continue
-            show_header_on_stdout(selected)
-            continue
+                    print("No match found.")
+            return
+        if 1 <= idx <= len(files):
+            selected = files[idx - 1]
+            print(f"Selected {selected}")
+        else:
+            print("Index out of range.")
 
-        if cmd == "edit":
-            if not selected:
-                print("No file selected.")
-                continue
-            interactive_edit_header(selected)
-            continue
+    def do_show(args: List[str]) -> None:
+        show_header_on_stdout(selected)
 
-        if cmd == "add":
-            if not selected:
-                print("No file selected.")
-                continue
-            did = add_default_header_to_file(selected)
-            print("Defaults added where missing." if did else "No changes necessary.")
-            continue
+    def do_edit(args: List[str]) -> None:
+        interactive_edit_header(selected)
 
-        if cmd == "remove":
-            if not selected:
-                print("No file selected.")
-                continue
-            remove_header_from_file(selected)
-            print("Header removed.")
-            continue
+    def do_add(args: List[str]) -> None:
+        did = add_default_header_to_file(selected)
+        print("Defaults added where missing." if did else "No changes necessary.")
 
-        if cmd == "bump":
-            if not selected:
-                print("No file selected.")
-                continue
-            if not args:
-                part = input("Which part to bump? (major/minor/patch): ").strip().lower()
-            else:
-                part = args[0].lower()
-            if part not in ("major", "minor", "patch"):
-                print("Invalid part.")
-                continue
-            if bump_version_in_file(selected, part):
-                print("Bumped.")
-            else:
-                print("Failed to bump.")
-            continue
+    def do_remove(args: List[str]) -> None:
+        remove_header_from_file(selected)
+        print("Header removed.")
 
-        if cmd == "bumpall":
-            part = args[0] if args else input("Which part to bump? (major/minor/patch): ").strip().lower()
-            path = args[1] if len(args) > 1 else "."
-            dry = "--dry-run" in args or "dry-run" in args
-            changes = bump_version_in_tree(path, part, dry_run=dry)
-            if dry:
-                print("Dry-run. Changes that would be made:")
-            for c in changes:
-                print(c)
-            print(f"{len(changes)} file(s) affected.")
-            continue
+    def do_bump(args: List[str]) -> None:
+        if not args:
+            part = input("Which part to bump? (major/minor/patch): ").strip().lower()
+        else:
+            part = args[0].lower()
+        if part not in ("major", "minor", "patch"):
+            print("Invalid part.")
+            return
+        if bump_version_in_file(selected, part):
+            print("Bumped.")
+        else:
+            print("Failed to bump.")
 
-        if cmd == "recurse":
-            start = args[0] if args else "."
-            dry = False
-            if len(args) > 1 and args[1] == "--dry-run":
-                dry = True
-            changes = apply_defaults_recursively(start, dry_run=dry)
-            if dry:
-                print("Dry-run. Files that would be changed:")
-            for c in changes:
-                print(c)
-            print(f"{len(changes)} file(s) {'would be changed' if dry else 'changed'}.")
-            continue
+    def do_bumpall(args: List[str]) -> None:
+        part = args[0] if args else input("Which part to bump? (major/minor/patch): ").strip().lower()
+        path = args[1] if len(args) > 1 else "."
+        dry = "--dry-run" in args or "dry-run" in args
+        changes = bump_version_in_tree(path, part, dry_run=dry)
+        _print_report("Dry-run. Changes that would be made:" if dry else None,
+                      changes, f"{len(changes)} file(s) affected.")
+
+    def do_recurse(args: List[str]) -> None:
+        start = args[0] if args else "."
+        dry = False
+        if len(args) > 1 and args[1] == "--dry-run":
+            dry = True
+        changes = apply_defaults_recursively(start, dry_run=dry)
+        _print_report("Dry-run. Files that would be changed:" if dry else None,
+                      changes, f"{len(changes)} file(s) {'would be changed' if dry else 'changed'}.")
+
+    def do_dryrun(args: List[str]) -> None:
+        if not args or args[0] != "recurse":
+            print("Unknown command. Type 'help' for commands.")
+            return
+        start = args[1] if len(args) > 1 else "."
+        changes = apply_defaults_recursively(start, dry_run=True)
+        _print_report("Dry-run. Files that would be changed:", changes,
+                      f"{len(changes)} file(s) would be changed.")
+
+    commands = {
+        "help": do_help, "h": do_help, "?": do_help,
+        "list": do_list, "ls": do_list,
+        "refresh": do_refresh,
+        "select": do_select,
+        "show": do_show,
+        "edit": do_edit,
+        "add": do_add,
+        "remove": do_remove,
+        "bump": do_bump,
+        "bumpall": do_bumpall,
+        "recurse": do_recurse,
+        "dryrun": do_dryrun,
+    }
 
-        if cmd == "dryrun" and len(args) >= 1 and args[0] == "recurse":
-            start = args[1] if len(args) > 1 else "."
-            changes = apply_defaults_recursively(start, dry_run=True)
-            print("Dry-run. Files that would be changed:")
-            for c in changes:
-                print(c)
-            print(f"{len(changes)} file(s) would be changed.")
+    print("BeHeaded interactive mainloop. Type 'help' for commands.")
+    while True:
+        prompt = f"[{os.path.basename(selected) if selected else 'no-file'}] > "
+        try:
+            cmdline = input(prompt).strip()
+        except (EOFError, KeyboardInterrupt):
+            print("\nExiting.")
+            return
+        if not cmdline:
             continue
+        parts = cmdline.split()
+        cmd = parts[0].lower()
 
-        print("Unknown command. Type 'help' for commands.")
+        if cmd in ("q", "quit", "exit"):
+            print("Exiting.")
+            return
+        handler = commands.get(cmd)
+        if handler is None:
+            print("Unknown command. Type 'help' for commands.")
+        elif cmd in _NEEDS_FILE and not selected:
+            print("No file selected.")
+        else:
+            handler(parts[1:])
 
 
 
@@ -17,7 +17,7 @@ class NamedDict:
         result = NamedDict()
         if name and not isinstance(name, str):
             name = str(name)
-        if data and not isinstance(data, dict):
+        if data is not None and not isinstance(data, dict):
             data = dict()
         result.name = name
         result.data = data
@@ -38,7 +38,7 @@ class NamedDict:
 
     def __eq__(self, obj)->bool:
         ''' Provide an equality test. '''
-        if id(self) == id(obj):
+        if self is obj:
             return True
         if not isinstance(obj, NamedDict):
             return False
@@ -46,11 +46,11 @@ class NamedDict:
             return False
         return self.data == obj.data
 
+    __hash__ = None # mutable: keep instances out of sets & dict keys
+
     def is_null(self)->bool:
         ''' See if the instance can be used. '''
-        if self.name == None or self.data == None:
-            return True
-        return not isinstance(self.name, str) and isinstance(self.data, dict)
+        return not (isinstance(self.name, str) and isinstance(self.data, dict))
 
 
 if __name__ == '__main__':
@@ -8,11 +8,60 @@
 #
 import os, sys, os.path
 sys.path.append('..')
-import shutil, json
+import shutil, json, threading
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import orjson # optional C JSON codec
+except ImportError:
+    orjson = None
 
 from beheaded.named_dict import NamedDict
 
+
+def _read_bytes(file_path):
+    ''' The raw content of a file. '''
+    with open(file_path, 'rb') as fh:
+        return fh.read()
+
+def _parse_json(raw):
+    ''' Parse JSON text held as bytes. '''
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _dump_json(file_path, data, mode='w'):
+    '''
+    Serialize `data` to a JSON file. Use mode 'x' to create-only.
+    Overwrites go through a temporary file and os.replace, so a crash
+    never leaves a half-written collection behind.
+    '''
+    if orjson:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2
+                               | orjson.OPT_NON_STR_KEYS
+                               | orjson.OPT_APPEND_NEWLINE)
+    else:
+        # Same bytes as the orjson branch, so files look alike either way
+        payload = (json.dumps(data, indent=2, ensure_ascii=False) + '\n').encode()
+    if mode == 'x':
+        with open(file_path, 'xb') as f:
+            f.write(payload)
+        return
+    tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+_CACHE_MAX = 512 # parsed files kept per StorageManager
+_POOL_MIN = 8     # fewer names than this are read serially
+
 class StorageManager:
 
     def __init__(self, app_name, folder_path=None):
@@ -22,6 +71,50 @@ class StorageManager:
         if not folder_path:
             folder_path = self.user_path
         self.folder_path = Path(folder_path).resolve()
+        self._folder_str = os.path.join(str(self.folder_path), '')
+        self._cache = {} # path str -> (st_mtime_ns, st_size, raw bytes)
+        self._cache_lock = threading.Lock() # readers may be threaded
+        self._dirty = set() # written / deleted since the last flush()
+        self._dirty_lock = threading.Lock()
+
+    def close(self):
+        ''' Nothing is held open between calls - here for storage_sql parity. '''
+
+    def _uncache(self, file_path):
+        ''' Forget a file's cached bytes. '''
+        with self._cache_lock:
+            self._cache.pop(file_path, None)
+
+    def _touched(self, file_path):
+        ''' Remember a changed file for the next flush(). '''
+        with self._dirty_lock:
+            self._dirty.add(file_path)
+
+    def flush(self):
+        '''
+        Make every collection written or deleted since the last flush
+        durable: fsync each file, then the folder once. Writes do not
+        fsync on their own - bulk callers pay for durability only here.
+        '''
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, set()
+        if not dirty:
+            return
+        for file_path in dirty:
+            try: # fsync needs write access on Windows
+                fd = os.open(file_path, os.O_RDWR | getattr(os, 'O_BINARY', 0))
+            except FileNotFoundError:
+                continue # deleted - the folder sync covers it
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        if hasattr(os, 'O_DIRECTORY') and self.folder_path.is_dir():
+            fd = os.open(self._folder_str, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
 
     def destroy(self, empty=False)->bool:
         '''
@@ -31,7 +124,7 @@ class StorageManager:
         Returns False if 'app folder is not able to be removed.
         '''
         if empty:
-            for node in self.list():
+            for node in list(self.list()): # not while scanning
                 self.delete(node)
         if self.folder_path.exists():
             # The directory must be empty:
@@ -39,17 +132,21 @@ class StorageManager:
             return not self.folder_path.exists()
         return True # gigo
 
-    def _get_file_path(self, name):
-        """ Get the full file path for a file name. """
+    def _get_file_path(self, name)->str:
+        """ Get the full file path (a str) for a file name. """
         if name.endswith('.json'):
-            return self.folder_path / name
-        return self.folder_path / f"{name}.json"
+            return self._folder_str + name
+        return self._folder_str + name + '.json'
 
     def exists(self, name:str)->bool:
         ''' See if the data's name already exists. '''
         if not name:
             return False
-        return self._get_file_path(name).exists()
+        try:
+            os.stat(self._get_file_path(name))
+        except OSError:
+            return False
+        return True
            
     def create(self, name, data)->NamedDict:
         '''
@@ -61,27 +158,47 @@ class StorageManager:
         if not data:
             data = {}
         file_path = self._get_file_path(name)
-        if file_path.exists():
+        try:
+            _dump_json(file_path, data, 'x')
+            self._uncache(file_path)
+            self._touched(file_path)
+        except FileExistsError:
             if not self.update(NamedDict.Create(name, data)):
                 raise IOError(f"Error: File {file_path} access error.")
-        else:
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=4)
-        return self.read(name)
+        return NamedDict.Create(name, dict(data) if isinstance(data, dict) else data) # no need to re-read
 
     def read(self, an_obj)->NamedDict:
         ''' Read the tag set associated with the name. None on error. '''
         if not an_obj:
             return None
-        if isinstance(an_obj, NamedDict):
+        if type(an_obj) is not str and isinstance(an_obj, NamedDict):
             an_obj = an_obj.name
         file_path = self._get_file_path(an_obj)
-        if file_path.exists():
-            fh = open(file_path, 'r')
-            data = json.load(fh)
-            fh.close()
-            return NamedDict.Create(an_obj, data)
-        return NamedDict()
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            self._uncache(file_path)
+            return NamedDict()
+        cached = self._cache.get(file_path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            raw = cached[2]
+        else:
+            raw = _read_bytes(file_path)
+            with self._cache_lock:
+                if len(self._cache) >= _CACHE_MAX:
+                    self._cache.pop(next(iter(self._cache)), None)
+                self._cache[file_path] = (st.st_mtime_ns, st.st_size, raw)
+        # Keep the bytes, not the dict: a hit skips the open and read, and
+        # decoding afresh hands every caller its own data (cheaper than deepcopy).
+        return NamedDict.Create(an_obj, _parse_json(raw))
+
+    def read_many(self, names)->dict:
+        ''' Read several tag sets at once. Returns {name: NamedDict}. '''
+        names = list(names)
+        if len(names) <= _POOL_MIN:
+            return {name: self.read(name) for name in names}
+        with ThreadPoolExecutor(max_workers=min(32, len(names))) as ex:
+            return dict(zip(names, ex.map(self.read, names)))
 
     def update(self, named_dict:NamedDict)->bool:
         ''' Replace the named tag set. False if file not updated.'''
@@ -90,11 +207,20 @@ class StorageManager:
         if not isinstance(named_dict, NamedDict):
             return False
         file_path = self._get_file_path(named_dict.name)
-        if named_dict.data == None:
+        if named_dict.data is None:
             named_dict.data = dict()
-        with open(file_path, 'w') as f:
-            json.dump(named_dict.data, f, indent=4)
-        return file_path.exists()
+        self._uncache(file_path)
+        _dump_json(file_path, named_dict.data, 'w') # raises if not written
+        self._touched(file_path)
+        return True
+
+    def write_many(self, items)->bool:
+        ''' Update several NamedDicts at once. False if any was not written. '''
+        items = list(items)
+        if len(items) <= _POOL_MIN:
+            return all([self.update(item) for item in items])
+        with ThreadPoolExecutor(max_workers=min(32, len(items))) as ex:
+            return all(list(ex.map(self.update, items)))
 
     def delete(self, obj)->bool:
         ''' Delete all key value pairs for the name.
@@ -102,26 +228,35 @@ class StorageManager:
         '''
         if not obj:
             return True
-        name = str(obj)
-        if isinstance(obj, NamedDict):
+        if type(obj) is str:
+            name = obj
+        elif isinstance(obj, NamedDict):
             name = obj.name
+        else:
+            name = str(obj)
         file_path = self._get_file_path(name)
-        if not file_path.exists():
+        self._uncache(file_path)
+        try:
+            os.unlink(file_path)
+        except FileNotFoundError:
             return True
-        file_path.unlink()
-        return not file_path.exists()
-
-    def list(self)->list:
-        ''' Get the name[s] of the collections, if any. '''
-        results = []
-        for json in self._list_files():
-            results.append(json.replace('.json',''))
-        return results
+        self._touched(file_path)
+        return True
+
+    def list(self):
+        ''' Generate the name[s] of the collections, if any. '''
+        return self._list_files()
     
-    def _list_files(self)->list:
-        """ List the names of all user created named-dictionaries (files.) """ 
-        files = self.folder_path.glob("*.json")
-        return [file.stem for file in files]
+    def _list_files(self):
+        """ Generate the names of all user created named-dictionaries (files.) """ 
+        try:
+            it = os.scandir(self.folder_path)
+        except FileNotFoundError:
+            return
+        with it:
+            for e in it:
+                if e.name.endswith('.json') and e.is_file():
+                    yield e.name[:-5]
 
 
 if __name__ == '__main__':
@@ -163,7 +298,7 @@ if __name__ == '__main__':
     if not sut.delete(row):
         print('Error 10080: Unable to remove file.')
         sys.exit(9)
-    if len(sut._list_files()):
+    if list(sut._list_files()):
         print('Error 10090: Unable to destroy file.')
         sys.exit(9)
     if not sut.destroy():
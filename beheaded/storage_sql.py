@@ -1,13 +1,210 @@
 # MISSION: Create a reusable NamedDict 'database' driver for Sqlite.
-# STATUS: Research
-# VERSION: 0.0.0
-# NOTES: Extenable NamedDict storage
+# STATUS: Testing
+# VERSION: 0.1.0
+# NOTES: Extenable NamedDict storage - every collection in one file.
 # DATE: 2026-01-21 17:58:34
 # FILE: storage_sql.py
 # AUTHOR: Randall Nagy
 #
+import sys, json, sqlite3, threading
+from pathlib import Path
+try:
+    import orjson # optional C JSON codec
+except ImportError:
+    orjson = None
 
-from named_dict import NamedDict
+from beheaded.named_dict import NamedDict
+
+DB_NAME = 'NamedDicts.sqlite3'
+_IN_MAX = 500 # bound parameters per SELECT ... IN (...)
+
+
+def _dumps(data):
+    ''' Serialize `data` to JSON text. '''
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False) # as orjson
+
+def _loads(text):
+    ''' Parse JSON text. '''
+    if orjson:
+        return orjson.loads(text)
+    return json.loads(text)
 
 class StorageManager:
-    pass
+    ''' Same interface as storage_file.StorageManager, one Sqlite file. '''
+
+    def __init__(self, app_name, folder_path=None):
+        """ Instance a TagManager for a folder path. Folder need not exist. """
+        self.user_path = Path.home() / app_name
+        self.user_path.mkdir(parents=True, exist_ok=True)
+        if not folder_path:
+            folder_path = self.user_path
+        self.folder_path = Path(folder_path).resolve()
+        self.db_path = self.folder_path / DB_NAME
+        self._conn = None
+        self._lock = threading.Lock() # one connection, many threads
+
+    def _db(self):
+        ''' Connect on first use - creates the folder & table. '''
+        if self._conn is None:
+            self.folder_path.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute('CREATE TABLE IF NOT EXISTS named_dict '
+                         '(name TEXT PRIMARY KEY, data TEXT NOT NULL)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        ''' Release the database connection, if any. '''
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def flush(self):
+        ''' Every write commits its own transaction - nothing to flush. '''
+
+    def destroy(self, empty=False)->bool:
+        '''
+        Attempt to remove the 'app data folder.
+        Use `empty` to delete every collection.
+        NOTE: USING `empty` DELETES ONLY THE DATABASE FILE.
+        Returns False if 'app folder is not able to be removed.
+        '''
+        if empty:
+            self.close()
+            if self.db_path.exists():
+                self.db_path.unlink()
+        if self.folder_path.exists():
+            # The directory must be empty:
+            self.folder_path.rmdir()
+            return not self.folder_path.exists()
+        return True # gigo
+
+    @staticmethod
+    def _get_name(obj):
+        ''' Collection name for a str or a NamedDict. '''
+        if type(obj) is str:
+            return obj
+        if isinstance(obj, NamedDict):
+            return obj.name
+        return str(obj)
+
+    def exists(self, name:str)->bool:
+        ''' See if the data's name already exists. '''
+        if not name:
+            return False
+        with self._lock:
+            row = self._db().execute(
+                'SELECT 1 FROM named_dict WHERE name = ?', (name,)).fetchone()
+        return row is not None
+
+    def create(self, name, data)->NamedDict:
+        '''
+        Create a new collection.
+        Updates content if has already been created.
+        '''
+        if not name:
+            return None
+        if not data:
+            data = {}
+        if not self.update(NamedDict.Create(name, data)):
+            raise IOError(f"Error: Collection {name} access error.")
+        return NamedDict.Create(name, dict(data) if isinstance(data, dict) else data)
+
+    def read(self, an_obj)->NamedDict:
+        ''' Read the tag set associated with the name. None on error. '''
+        if not an_obj:
+            return None
+        name = self._get_name(an_obj)
+        with self._lock:
+            row = self._db().execute(
+                'SELECT data FROM named_dict WHERE name = ?', (name,)).fetchone()
+        if row is None:
+            return NamedDict()
+        return NamedDict.Create(name, _loads(row[0]))
+
+    def read_many(self, names)->dict:
+        ''' Read several tag sets at once. Returns {name: NamedDict}. '''
+        names = [self._get_name(name) for name in names]
+        found = {}
+        with self._lock:
+            db = self._db()
+            for ss in range(0, len(names), _IN_MAX):
+                chunk = names[ss:ss + _IN_MAX]
+                marks = ','.join('?' * len(chunk))
+                found.update(db.execute(
+                    f'SELECT name, data FROM named_dict WHERE name IN ({marks})',
+                    chunk))
+        return {name: NamedDict.Create(name, _loads(found[name]))
+                if name in found else NamedDict() for name in names}
+
+    def update(self, named_dict:NamedDict)->bool:
+        ''' Replace the named tag set. False if not updated.'''
+        return self.write_many([named_dict])
+
+    def write_many(self, items)->bool:
+        ''' Update several NamedDicts in one transaction. False if any is invalid. '''
+        rows = []
+        for named_dict in items:
+            if not named_dict or not isinstance(named_dict, NamedDict):
+                return False
+            if named_dict.data is None:
+                named_dict.data = dict()
+            rows.append((named_dict.name, _dumps(named_dict.data)))
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany('INSERT OR REPLACE INTO named_dict '
+                               '(name, data) VALUES (?, ?)', rows)
+        return True
+
+    def delete(self, obj)->bool:
+        ''' Delete all key value pairs for the name.
+            return False if unable to delete the tag set.
+        '''
+        if not obj:
+            return True
+        name = self._get_name(obj)
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute('DELETE FROM named_dict WHERE name = ?', (name,))
+        return True
+
+    def list(self):
+        ''' Generate the name[s] of the collections, if any. '''
+        with self._lock: # fetch first - not holding the lock while yielding
+            rows = self._db().execute(
+                'SELECT name FROM named_dict ORDER BY name').fetchall()
+        for row in rows:
+            yield row[0]
+
+
+if __name__ == '__main__':
+    # Basic test cases
+    sut = StorageManager('~test.StorageManagerSql')
+    print(f'Testing [{sut.db_path}]')
+    row = sut.create('testA', dict())
+    if not row or row.is_null():
+        print('Error 10010: Collection creation error.')
+        sys.exit(9)
+    row.data['one'] = 1
+    row.data['two'] = 2
+    if not sut.update(row):
+        print('Error: Update.')
+    if row != sut.read(row.name):
+        print("Error 10050: Equality error.")
+        sys.exit(9)
+    if list(sut.list()) != ['testA']:
+        print("Error 10060: List error.")
+        sys.exit(9)
+    if not sut.delete(row) or sut.exists(row.name):
+        print('Error 10080: Unable to remove collection.')
+        sys.exit(9)
+    if not sut.destroy(empty=True):
+        print('Error 10100: Unable to unlink nexus.')
+        sys.exit(9)
+    print("Testing Success")
+    sys.exit(0)
@@ -15,15 +15,22 @@ from beheaded.storage_file import StorageManager
 
 class TagManager:
     """ Manage user-named dictionaries in a database in a specific folder. """ 
-    def __init__(self, app_name, folder_path=None):
-        """ Instance a TagManager for a folder path. Folder need not exist. """ 
+    def __init__(self, app_name, folder_path=None, backend='file'):
+        """ Instance a TagManager for a folder path. Folder need not exist.
+            Use backend='sql' to keep every collection in one Sqlite file. """ 
         self.user_path = Path.home() / app_name
         self.user_path.mkdir(parents=True, exist_ok=True)
         if not folder_path:
             folder_path = self.user_path
         self.folder_path = Path(folder_path).resolve()
         self.escape = '.!' # special 'ops token
-        self.dba = StorageManager(app_name, self.folder_path) # driver
+        if backend == 'sql':
+            from beheaded.storage_sql import StorageManager as driver
+        elif backend == 'file':
+            driver = StorageManager
+        else:
+            raise ValueError(f"Unknown backend '{backend}'.")
+        self.dba = driver(app_name, self.folder_path) # driver
 
     def destroy_app_folder(self)->bool:
         """ Remove the app folder and all it contains. """
@@ -70,19 +77,22 @@ class TagManager:
             return True
         return False
 
-    def show_dict(self, a_dict):
-        ''' Line a dictionary to the screen. '''
+    @staticmethod
+    def _format_dict(a_dict)->str:
+        ''' The show_dict text for a dictionary. '''
         if not a_dict:
-            print("{}")
-            return
+            return "{}\n"
         if isinstance(a_dict, NamedDict):
             a_dict = a_dict.data
         if not isinstance(a_dict, dict):
-            print("{}")
-            return
-        for key in a_dict:
-            print(f"{key} : {a_dict[key]}")
-        print()
+            return "{}\n"
+        buf = [f"{key} : {value}\n" for key, value in a_dict.items()]
+        buf.append("\n")
+        return ''.join(buf)
+
+    def show_dict(self, a_dict):
+        ''' Line a dictionary to the screen. '''
+        sys.stdout.write(self._format_dict(a_dict))
 
 
     def _edit_keys(self, data:dict)->dict:
@@ -180,11 +190,10 @@ class TagManager:
 
     def exe_list(self):
         """ Display collection list. """
-        rows = self.dba.list()
-        if rows:
-            print("Collection:")
-            for ss, f in enumerate(rows, 1):
-                print(f"{ss}) {f}")
+        for ss, f in enumerate(self.dba.list(), 1):
+            if ss == 1:
+                print("Collection:")
+            print(f"{ss}) {f}")
 
     def do_create(self, **kwargs):
         ''' Create a new named collection. '''
@@ -212,13 +221,13 @@ class TagManager:
     
     def do_report(self, **kwargs):
         ''' List all Collection content. '''
-        rows = self.dba.list()
-        if rows:
-            print("*** Collection Report ***\n")
-            for a_set in rows:
-                print(f"Collection: [{a_set}]")
-                data = self.exe_read_set(a_set)
-                self.show_dict(data)
+        results = self.dba.read_many(self.dba.list()) # in list() order
+        if results:
+            buf = ["*** Collection Report ***\n\n"]
+            for a_set, data in results.items():
+                buf.append(f"Collection: [{a_set}]\n")
+                buf.append(self._format_dict(data))
+            sys.stdout.write(''.join(buf))
         else:
             print(f"No data in {self.folder_path}.")    
     
@@ -232,30 +241,30 @@ class TagManager:
         print(f"Managing folder: {self.folder_path}")
         self.create_folder_if_not_exists()
         self.exe_list()
-        options = {
-            'Create':self.do_create,
-            'Read':self.do_read,
-            'Update':self.do_update,
-            'Delete':self.do_delete,
-            'List':self.do_list,
-            'Report':self.do_report,
-            'Quit':self.do_quit
-            }
-        keys = list(options.keys())
+        handlers = (
+            ('Create', self.do_create),
+            ('Read', self.do_read),
+            ('Update', self.do_update),
+            ('Delete', self.do_delete),
+            ('List', self.do_list),
+            ('Report', self.do_report),
+            ('Quit', self.do_quit),
+            )
+        nkeys = len(handlers)
+        menu = '\n' + ''.join(f'{ss}.) {op}:\t{func.__doc__}\n'
+                              for ss, (op, func) in enumerate(handlers, 1))
         times=0
         while True:
-            print();selection = None
-            for ss, op in enumerate(keys, 1):
-                print(f'{ss}.) {op}:\t{options[op].__doc__}')
+            selection = None
+            sys.stdout.write(menu)
             try:
                 selection = input("Enter #: ")
                 which = int(selection.strip())
-                if which > 0 and which <= len(keys):
+                if which > 0 and which <= nkeys:
                     times = 0
-                    selection = keys[which-1]
-                    if selection in options: # double check
-                        print('*'*which, selection)
-                        options[selection]()
+                    selection, func = handlers[which-1]
+                    print('*'*which, selection)
+                    func()
                 else:
                     print(f"Invalid number {which}.")
             except Exception as ex:
@@ -9,8 +9,11 @@
 # AUTHOR: Randall Nagy
 #
 import os
+import sys
 import json
 import textwrap
+import subprocess
+import pytest
 from beheaded import (
     read_file_header,
     write_header_to_file,
@@ -88,3 +91,188 @@ def test_apply_defaults_recursively(tmp_path):
     p1 = make_temp_py("print('x')\n", folder, "e1.py")
     changed = apply_defaults_recursively(folder, dry_run=True)
     assert any("e1.py" in c for c in changed)
+
+def test_import_order_tag_manager():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for code in ("import beheaded; import beheaded.tag_manager; beheaded.TagManager",
+                 "import beheaded.tag_manager; import beheaded; beheaded.TagManager"):
+        subprocess.run([sys.executable, "-c", code], cwd=root, check=True)
+
+def test_add_defaults_fixes_stale_file_and_is_idempotent(tmp_path):
+    folder = str(tmp_path)
+    p = make_temp_py("print('x')\n", folder, "f1.py")
+    assert add_default_header_to_file(p) is True
+    assert add_default_header_to_file(p) is False
+    os.rename(p, os.path.join(folder, "f2.py"))
+    p2 = os.path.join(folder, "f2.py")
+    assert add_default_header_to_file(p2) is True
+    _, header, _ = read_file_header(p2)
+    assert header.get("FILE") == "f2.py"
+
+def test_storage_read_cache_sees_external_writes(tmp_path, monkeypatch):
+    from beheaded.storage_file import StorageManager
+    monkeypatch.setenv("HOME", str(tmp_path))
+    sm = StorageManager(".beheaded-test", str(tmp_path))
+    sm.create("tags", {"a": "1"})
+    row = sm.read("tags")
+    row.data["a"] = "mutated"
+    assert sm.read("tags").data == {"a": "1"}
+    with open(tmp_path / "tags.json", "w") as fh:
+        json.dump({"a": "1", "b": "22"}, fh)
+    assert sm.read("tags").data == {"a": "1", "b": "22"}
+    assert sm.delete("tags")
+    assert sm.read("tags").is_null()
+
+def test_storage_bulk_read_and_write(tmp_path, monkeypatch):
+    from beheaded.storage_file import StorageManager
+    from beheaded.named_dict import NamedDict
+    monkeypatch.setenv("HOME", str(tmp_path))
+    sm = StorageManager(".beheaded-test", str(tmp_path))
+    rows = [NamedDict.Create(f"c{i}", {"i": str(i)}) for i in range(20)]
+    assert sm.write_many(rows)
+    names = [row.name for row in rows] + ["missing"]
+    got = sm.read_many(names)
+    assert list(got) == names
+    assert all(got[row.name] == row for row in rows)
+    assert got["missing"].is_null()
+
+def test_tag_manager_sql_backend(tmp_path, monkeypatch):
+    from beheaded.tag_manager import TagManager
+    monkeypatch.setenv("HOME", str(tmp_path))
+    tm = TagManager(".beheaded-test", str(tmp_path / "db"), backend="sql")
+    tm.dba.create("b", {"x": "1"})
+    tm.dba.create("a", {})
+    assert list(tm.dba.list()) == ["a", "b"]
+    assert tm.dba.exists("b") and not tm.dba.exists("c")
+    assert tm.dba.read("b").data == {"x": "1"}
+    assert list(tm.dba.read_many(["b", "c"])) == ["b", "c"]
+    assert tm.dba.read_many(["c"])["c"].is_null()
+    assert tm.dba.delete("b") and list(tm.dba.list()) == ["a"]
+    assert tm.dba.destroy(empty=True)
+
+def test_read_file_header_returns_fresh_copies(tmp_path):
+    p = make_temp_py("# NOTES: one\nprint(1)\n", str(tmp_path), "g.py")
+    _, header, rest = read_file_header(p)
+    header.set("NOTES", "changed")
+    rest.append("junk")
+    _, header2, rest2 = read_file_header(p)
+    assert header2.get("NOTES") == "one"
+    assert rest2 == ["print(1)"]
+    make_temp_py("# NOTES: two, longer\nprint(1)\n", str(tmp_path), "g.py")
+    assert read_file_header(p)[1].get("NOTES") == "two, longer"
+
+def test_bump_version_tree_stops_at_unreadable_file(tmp_path, monkeypatch):
+    from beheaded import core
+    folder = str(tmp_path / "read")
+    os.mkdir(folder)
+    for name in ("h1.py", "h2.py", "h4.py", "h5.py"):
+        make_temp_py("# VERSION: 1.0.0\n", folder, name)
+    with open(os.path.join(folder, "h3.py"), "wb") as fh:
+        fh.write(b"# VERSION: 1.0.0\n\xff\xfe\n")
+    with pytest.raises(UnicodeDecodeError):
+        bump_version_in_tree(folder, "patch")
+    versions = [read_file_header(os.path.join(folder, n))[1].get("VERSION") for n in ("h1.py", "h2.py", "h4.py", "h5.py")]
+    assert versions == ["1.0.1", "1.0.1", "1.0.0", "1.0.0"]
+    # a failing write stops the walk the same way
+    folder = str(tmp_path / "write")
+    os.mkdir(folder)
+    names = [f"f{i:02d}.py" for i in range(30)]
+    for name in names:
+        make_temp_py("# VERSION: 1.0.0\n", folder, name)
+    write_lines = core._write_lines
+    def failing_write(path, lines):
+        if path.endswith("f03.py"):
+            raise OSError("disk full")
+        write_lines(path, lines)
+    monkeypatch.setattr(core, "_write_lines", failing_write)
+    with pytest.raises(OSError):
+        bump_version_in_tree(folder, "patch")
+    versions = [read_file_header(os.path.join(folder, n))[1].get("VERSION") for n in names]
+    assert versions == ["1.0.1"] * 3 + ["1.0.0"] * 27
+
+def test_storage_survives_recreated_folder(tmp_path, monkeypatch):
+    from beheaded.tag_manager import TagManager
+    monkeypatch.setenv("HOME", str(tmp_path))
+    tm = TagManager(".beheaded-test")
+    tm.dba.create("a", {})
+    assert tm.destroy_app_folder()
+    tm.create_folder_if_not_exists()
+    tm.dba.create("b", {"x": "1"})
+    assert list(tm.dba.list()) == ["b"]
+    assert tm.dba.exists("b")
+    assert tm.dba.read("b").data == {"x": "1"}
+    assert tm.dba.create("c", {}).name == "c"
+
+def test_write_keeps_hard_links_and_refuses_read_only(tmp_path):
+    p = make_temp_py("# VERSION: 1.0.0\n", str(tmp_path), "k.py")
+    link = os.path.join(str(tmp_path), "k_link.py")
+    os.link(p, link)
+    assert bump_version_in_file(p, "patch")
+    assert os.path.samefile(p, link)
+    os.chmod(p, 0o444)
+    if os.access(p, os.W_OK):  # root and friends may write anyway
+        return
+    with pytest.raises(PermissionError):
+        bump_version_in_file(p, "patch")
+    assert read_file_header(p)[1].get("VERSION") == "1.0.1"
+
+def test_storage_flush_after_write_and_delete(tmp_path, monkeypatch):
+    from beheaded.storage_file import StorageManager
+    from beheaded.storage_sql import StorageManager as SqlStorageManager
+    monkeypatch.setenv("HOME", str(tmp_path))
+    for sm in (StorageManager(".beheaded-test", str(tmp_path / "f")),
+               SqlStorageManager(".beheaded-test", str(tmp_path / "s"))):
+        sm.folder_path.mkdir(exist_ok=True)
+        sm.create("keep", {"a": "1"})
+        sm.create("gone", {})
+        assert sm.delete("gone")
+        sm.flush()
+        assert not getattr(sm, "_dirty", ())
+        sm.flush()
+        assert sm.read("keep").data == {"a": "1"}
+        assert not sm.exists("gone")
+        sm.close()
+
+def test_bulk_writes_do_not_fill_header_cache(tmp_path):
+    from beheaded import core
+    folder = str(tmp_path)
+    paths = [make_temp_py("# VERSION: 0.0.1\n", folder, f"m{i}.py") for i in range(3)]
+    bump_version_in_tree(folder, "patch")
+    assert not any(os.path.abspath(p) in core._header_cache for p in paths)
+    assert read_file_header(paths[0])[1].get("VERSION") == "0.0.2"
+
+def test_storage_file_format_does_not_depend_on_orjson(tmp_path, monkeypatch):
+    from beheaded import storage_file
+    monkeypatch.setenv("HOME", str(tmp_path))
+    data = {"name": "Zoë ✓", "nested": {"k": ["1", "2"]}, "quote": 'a"b'}
+    written = []
+    for codec in (storage_file.orjson, None):
+        monkeypatch.setattr(storage_file, "orjson", codec)
+        sm = storage_file.StorageManager(".beheaded-test", str(tmp_path))
+        sm.update(storage_file.NamedDict.Create("fmt", data))
+        written.append((tmp_path / "fmt.json").read_bytes())
+        assert sm.read("fmt").data == data
+    assert written[0] == written[1]
+    assert written[1].decode("utf-8").startswith('{\n  "name": "Zoë ✓"')
+
+def test_storage_create_with_non_dict_data(tmp_path, monkeypatch):
+    from beheaded.storage_file import StorageManager
+    from beheaded.storage_sql import StorageManager as SqlStorageManager
+    monkeypatch.setenv("HOME", str(tmp_path))
+    for sm in (StorageManager(".beheaded-test", str(tmp_path)),
+               SqlStorageManager(".beheaded-test", str(tmp_path))):
+        row = sm.create("x", "abc")
+        assert row.name == "x" and row.data == {}
+        sm.close()
+
+def test_package_type_checking_imports_match_lazy_names():
+    import ast
+    import beheaded
+    with open(beheaded.__file__, encoding="utf-8") as fh:
+        tree = ast.parse(fh.read())
+    block = next(node for node in tree.body if isinstance(node, ast.If)
+                 and getattr(node.test, "id", None) == "TYPE_CHECKING")
+    imported = {imp.module: tuple(a.name for a in imp.names) for imp in block.body}
+    assert imported == {"core": beheaded._CORE_NAMES, "tag_manager": beheaded._TAG_NAMES}
+    assert beheaded.__all__ == beheaded._CORE_NAMES + beheaded._TAG_NAMES
+    assert all(getattr(beheaded, name) for name in beheaded.__all__)